@@ -1,465 +1,747 @@
-"""
-Google Cloud Pub/Sub Data Publisher for App Store Simulation.
-
-This module provides functionality to generate and publish simulated app store user interaction
-events to Google Cloud Pub/Sub. It supports configurable data profiles, event types, and
-publishing rates for testing and development purposes.
-
-The module generates realistic mock data including:
-- User search queries
-- App reviews and ratings
-- In-app purchases
-- Device and OS information
-- Geographic distribution
-
-Example:
-    python 01_publisher_initial.py --config publisher_config.json
-
-Dependencies:
-    - google-cloud-pubsub
-    - faker
-    - argparse
-    - json
-    - time
-    - uuid
-    - random
-
-Author: App Store Simulation Team
-License: MIT
-"""
-
-import argparse
-import json
-import time
-import datetime
-import pytz
-import math
-import uuid
-import random
-from typing import Dict, Any
-from faker import Faker
-from google.cloud import pubsub_v1
-from google.cloud.pubsub_v1.publisher.futures import Future
-
-# Global variables
-HOURLY_MODULATION_FACTORS = [
-    0.272, 0.251, 0.230, 0.210, 0.190,
-    0.172, 0.155, 0.138, 0.123, 0.108,
-    0.095, 0.083, 0.072, 0.062, 0.054,
-    0.047, 0.041, 0.036, 0.033, 0.031,
-    0.030, 0.031, 0.033, 0.036, 0.041,
-    0.047, 0.054, 0.062, 0.072, 0.083,
-    0.095, 0.108, 0.123, 0.138, 0.155,
-    0.172, 0.190, 0.210, 0.230, 0.251,
-    0.273, 0.295, 0.318, 0.341, 0.365,
-    0.389, 0.414, 0.439, 0.464, 0.490,
-    0.515, 0.540, 0.566, 0.591, 0.616,
-    0.641, 0.665, 0.689, 0.712, 0.735,
-    0.758, 0.779, 0.800, 0.820, 0.840,
-    0.858, 0.875, 0.892, 0.907, 0.922,
-    0.935, 0.947, 0.958, 0.968, 0.976,
-    0.983, 0.989, 0.994, 0.997, 0.999,
-    1.000, 0.999, 0.997, 0.994, 0.989,
-    0.983, 0.976, 0.968, 0.958, 0.947,
-    0.935, 0.922, 0.907, 0.892, 0.875,
-    0.858, 0.840, 0.820, 0.800, 0.779,
-    0.758, 0.735, 0.712, 0.689, 0.665,
-    0.641, 0.616, 0.591, 0.566, 0.540,
-    0.515, 0.490, 0.464, 0.439, 0.414,
-    0.389, 0.365, 0.341, 0.318, 0.295,
-]  # Each hour broken into 5 segments -> 24*5=120 factors
-USERS_BY_COUNTRY = {}
-GLOBAL_TIMESTAMP_MICROS = 0
-GLOBAL_TIMESTAMP_HOUR = 0.0
-GLOBAL_RATE_MAXIMUM = 0.0
-
-# Initialize Faker for generating mock data
-fake = Faker()
-
-def get_current_timestamp_micros() -> int:
-    """
-    Get the current timestamp in microseconds since epoch.
-    """
-    return int(time.time() * 1_000_000)
-
-def get_current_hour() -> float:
-    """
-    Get the current hour in the timezone of Iran.
-    """
-    now = datetime.datetime.now(tz=pytz.timezone("Asia/Tehran"))
-    return now.hour + round(now.minute/60, 1)
-
-def user_daily_activity_pattern(hour: float) -> float:
-    """
-    Get the user's daily activity pattern based on the hour.
-    """
-    # Discretized to reduce computation time
-    # Continiuous modulation: modulation = 0.03 + 0.97 * (1+math.cos( (hour-16) * (2*math.pi/24) ))/2
-    # Discrete modulation   : modulation = HOURLY_MODULATION_FACTORS[int((hour%24)*5)]
-    modulation = HOURLY_MODULATION_FACTORS[int( (hour%24)*5 )]
-    return modulation
-
-def generate_time_modulated_weights(country_infos: Dict[str, Any]) -> Dict[str, float]:
-    """
-    Get time-modulated weights for each country based on the country's timezone.
-    
-    This function uses the country's timezone to modulate the weights of the countries.
-    """
-    # --- Step 1: Get the current hour ---
-    current_hour = round(GLOBAL_TIMESTAMP_HOUR, 2)
-    # --- Step 2: Get the country distribution and timezone ---
-    country_distribution = country_infos.get("distribution", {})
-    country_timezone = country_infos.get("timezone", {})
-    country_distribution_modulated = country_infos.get("distribution_modulated", {})
-    # --- Step 3: Generate the time-modulated weights ---
-    country_distribution_modulated_sum = 0.0
-    for country, weight in country_distribution.items():
-        country_hour = current_hour + country_timezone[country]
-        country_distribution_modulated[country] = weight * user_daily_activity_pattern(country_hour)
-        country_distribution_modulated_sum += country_distribution_modulated[country]
-    # --- Step 4: Return the time-modulated weights ---
-    return country_distribution_modulated, country_distribution_modulated_sum
-
-def get_weighted_choice(distribution: Dict[str, float]) -> str:
-    """
-    Select a key from a dictionary based on its weighted distribution.
-    
-    This function uses random.choices to select items based on their probability weights.
-    The values in the dictionary should sum to 1.0 for proper probability distribution.
-    
-    Args:
-        distribution: A dictionary where keys are the items to choose
-                     and values are their probabilities (should sum to 1.0).
-                     
-    Returns:
-        The chosen key based on weighted random selection.
-        
-    Raises:
-        ValueError: If the distribution dictionary is empty.
-        
-    Example:
-        >>> dist = {"A": 0.6, "B": 0.4}
-        >>> get_weighted_choice(dist)
-        "A"  # 60% chance
-    """
-    if not distribution:
-        raise ValueError("Distribution dictionary cannot be empty")
-    
-    choices, weights = zip(*distribution.items())
-    return random.choices(choices, weights=weights, k=1)[0]
-
-def generate_event(config: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Generate a single user interaction event based on the configuration.
-    
-    Creates realistic mock data for app store user interactions including app opens,
-    searches, installs, reviews, in-app purchases, app closes, and uninstalls.
-    The event structure follows a standardized format with configurable distributions
-    for various attributes.
-    
-    Args:
-        config: The loaded publisher configuration containing event type, device type,
-               and country code distributions.
-    
-    Returns:
-        A dictionary representing the user interaction event with the following structure:
-        - event_id: Unique UUID for the event
-        - event_timestamp: ISO8601 formatted timestamp
-        - user_id: Unique UUID for the user
-        - session_id: Unique UUID for the session
-        - event_type: Type of interaction (app_open, search, app_install, review_submit, 
-                     in_app_purchase, app_close, app_uninstall)
-        - app_id: Random app identifier
-        - device_type: Device type based on distribution
-        - os_version: Operating system and version
-        - country_code: Country code based on distribution
-        - event_details: JSON string with event-specific details
-        
-    Example:
-        >>> config = {"event_type": {"distribution": {"search": 0.5}}}
-        >>> event = generate_event(config)
-        >>> event["event_type"]
-        "search"
-    """
-    global USERS_BY_COUNTRY, GLOBAL_TIMESTAMP_MICROS, GLOBAL_TIMESTAMP_HOUR, GLOBAL_RATE_MAXIMUM
-    #########################################
-    # --- Poisson distribution for events --- #
-    #########################################
-    dt_seconds = random.expovariate(GLOBAL_RATE_MAXIMUM)
-    GLOBAL_TIMESTAMP_MICROS += int(dt_seconds*1_000_000)
-    GLOBAL_TIMESTAMP_HOUR += dt_seconds/3600
-    
-    #########################
-    # --- Country code --- #
-    #########################
-    country_infos = config.get("country_infos", {})
-    country_distribution_modulated, country_distribution_modulated_sum = generate_time_modulated_weights(
-        country_infos
-    )
-    # Thinning step: accept/reject an event!
-    if random.random() > (country_distribution_modulated_sum/GLOBAL_RATE_MAXIMUM):
-        return None
-    country_code = get_weighted_choice(country_distribution_modulated)
-    user_id = random.choice(USERS_BY_COUNTRY[country_code])
-
-    #########################
-    # --- Event type ---    #
-    #########################
-    event_type = get_weighted_choice(config.get("event_type", {}).get("distribution", {}))
-
-    event_details_obj = {}
-    if event_type == "search":
-        event_details_obj["search_query"] = fake.bs()
-    elif event_type == "review_submit":
-        event_details_obj["rating"] = random.randint(1, 5)
-    elif event_type == "in_app_purchase":
-        event_details_obj["item_id"] = f"iap_{random.randint(100,999)}"
-        event_details_obj["price_usd"] = round(random.uniform(0.99, 99.99), 2)
-
-    #########################
-    # --- Current timestamp --- #
-    #########################
-    current_timestamp = get_current_timestamp_micros()
-
-    event = {
-        "generation_timestamp": current_timestamp,
-        "event_id": str(uuid.uuid4()),
-        "event_timestamp": GLOBAL_TIMESTAMP_MICROS,
-        "user_id": user_id,
-        "session_id": fake.uuid4(),
-        "event_type": event_type,
-        "app_id": f"app_{random.randint(1000, 9999)}",
-        "device_type": get_weighted_choice(config.get("device_type", {}).get("distribution", {})),
-        "os_version": f"{random.choice(['iOS', 'Android'])} {random.randint(12, 15)}.{random.randint(0, 5)}",
-        "country_code": country_code,
-        "event_details": json.dumps(event_details_obj)
-    }
-    return event
-
-def publish_messages_batch(project_id: str, topic_name: str, config: Dict[str, Any]) -> None:
-    """
-    Generate and publish messages to a Pub/Sub topic using automatic batching.
-    
-    This function continuously generates mock app store events and publishes them to
-    the specified Google Cloud Pub/Sub topic. It uses the client library's automatic
-    batching for optimal performance and handles publish callbacks for monitoring
-    success/failure rates.
-    
-    The publisher will collect messages for up to 1 second or until 500 messages
-    are collected, whichever comes first, before publishing the batch.
-    
-    Args:
-        project_id: Google Cloud project ID where the Pub/Sub topic exists.
-        topic_name: Name of the Pub/Sub topic to publish messages to.
-        config: Publisher configuration containing event distributions and publishing settings.
-               Expected to have 'generation_rate' key with 'events_per_second' and 
-               'randomness_factor' for rate control.
-    
-    Raises:
-        Exception: Catches and logs any unexpected errors during publishing.
-        
-    Note:
-        This function runs indefinitely until interrupted. Use Ctrl+C to stop.
-        The function will print status updates every 1000 published messages.
-    """
-    # --- Batching Settings ---
-    # The publisher will collect messages for 1 second or until 500 messages
-    # are collected, whichever comes first.
-    batch_settings = pubsub_v1.types.BatchSettings(
-        max_messages=500,
-        max_latency=1,  # 1 second
-    )
-    publisher = pubsub_v1.PublisherClient(batch_settings)
-    topic_path = publisher.topic_path(project_id, topic_name)
-
-    print(f"Publisher starting for project '{project_id}' on topic '{topic_name}'.")
-    print(f"Generating data based on profile: {config.get('description')}")
-    print(f"Using automatic batching (max {batch_settings.max_messages} messages or {batch_settings.max_latency}s latency).")
-    
-    rate_config = config.get("generation_rate", {})
-    base_rate = rate_config.get("events_per_second", 0)  # 0 means no rate control
-    randomness = rate_config.get("randomness_factor", 0.1)
-    
-    # Callback for handling publish results
-    published_count = 0
-    failed_count = 0
-    
-    def callback(future: Future) -> None:
-        """
-        Handle the result of a publish operation.
-        
-        This callback is called when a message publish operation completes.
-        It updates the success/failure counters and logs any errors.
-        
-        Args:
-            future: The Future object representing the publish operation.
-        """
-        nonlocal published_count, failed_count
-        try:
-            # .result() will raise an exception if publishing failed.
-            future.result()
-            published_count += 1
-        except Exception as e:
-            failed_count += 1
-            print(f"Failed to publish message: {e}")
-
-    try:
-        while True:
-            # Generate a single event
-            event_data = generate_event(config)
-            if event_data is None:
-                continue
-
-            # Convert the dictionary to a JSON string (UTF-8 encoded bytes)
-            data = json.dumps(event_data).encode("utf-8")
-
-            # The publish() method is non-blocking. It returns a future.
-            # The client library handles batching in a background thread.
-            future = publisher.publish(topic_path, data)
-            future.add_done_callback(callback)
-            
-            # Control the publishing rate
-            if base_rate > 0:
-                sleep_duration = (1 / base_rate) * (1 + random.uniform(-randomness, randomness))
-                time.sleep(max(0, sleep_duration))
-            else:
-                time.sleep( 0.00225 )  # No more than 445 req/sec
-
-            # Optional: print a status message periodically
-            if published_count > 0 and published_count % 100_000 == 0:
-                print(f"Published {published_count} messages so far...", flush=True)
-
-    except KeyboardInterrupt:
-        print(f"\nPublisher stopped by user. Total published: {published_count}, failed: {failed_count}")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
-        print(f"Total published: {published_count}, failed: {failed_count}")
-
-
-def main() -> None:
-    """
-    Main entry point for the Pub/Sub Data Publisher.
-    
-    Parses command line arguments, loads the configuration file, validates
-    required settings, and starts the message publishing process.
-    
-    Command Line Arguments:
-        --config: Path to the publisher JSON configuration file (required).
-    
-    Configuration File Requirements:
-        - gcp_project_id: Google Cloud project ID
-        - pubsub_topic_name: Name of the Pub/Sub topic
-        - event_type: Event type distribution configuration
-        - device_type: Device type distribution configuration
-        - country_infos: Country code distribution configuration
-        - generation_rate: Rate control settings (optional)
-        - description: Human-readable description of the data profile
-    
-    Example Configuration:
-        {
-            "gcp_project_id": "my-project",
-            "pubsub_topic_name": "app-store-events",
-            "event_type": {
-                "distribution": {
-                    "app_open": 0.4,
-                    "search": 0.3,
-                    "app_install": 0.15,
-                    "review_submit": 0.05,
-                    "in_app_purchase": 0.05,
-                    "app_close": 0.04,
-                    "app_uninstall": 0.01
-                }
-            },
-            "device_type": {
-                "distribution": {"phone": 0.8, "tablet": 0.15, "desktop": 0.05}
-            },
-            "country_infos": {
-                "distribution": {"US": 0.3, "CA": 0.3, "IR": 0.4}
-            },
-            "generation_rate": {
-                "events_per_second": 0,
-                "randomness_factor": 0.2
-            },
-            "description": "Standard app store traffic profile"
-        }
-    
-    Raises:
-        FileNotFoundError: If the configuration file doesn't exist.
-        json.JSONDecodeError: If the configuration file contains invalid JSON.
-        SystemExit: If required configuration values are missing.
-    """
-    global GLOBAL_TIMESTAMP_MICROS, GLOBAL_TIMESTAMP_HOUR, GLOBAL_RATE_MAXIMUM
-
-    parser = argparse.ArgumentParser(
-        description="Pub/Sub Data Publisher for App Store Simulation",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  python 01_publisher_initial.py --config publisher_config.json
-  python 01_publisher_initial.py --config /path/to/config.json
-        """
-    )
-    parser.add_argument(
-        "--config",
-        required=True,
-        help="Path to the publisher JSON configuration file.",
-    )
-    args = parser.parse_args()
-
-    # Load publisher configuration
-    try:
-        with open(args.config, 'r') as f:
-            config = json.load(f)
-    except FileNotFoundError:
-        print(f"Error: Configuration file not found at {args.config}")
-        return
-    except json.JSONDecodeError:
-        print(f"Error: Could not decode JSON from {args.config}")
-        return
-
-    project_id = config.get("gcp_project_id")
-    topic_name = config.get("pubsub_topic_name")
-
-    if not project_id or not topic_name:
-        print("Error: 'gcp_project_id' and 'pubsub_topic_name' must be set in the config file.")
-        return
-
-    # Initialize users by country
-    # --- Step 1: Get the country distribution ---
-    country_infos = config.get("country_infos", {})
-    country_distribution = country_infos.get("distribution", {})
-    country_infos['distribution_modulated'] = { country: 0.0 for country in country_distribution }
-    # --- Step 2: Get the simulation parameters ---
-    simulation_parameters = config.get("simulation_parameters", {})
-    users_population_fraction = simulation_parameters.get("users_population_fraction", 0.001)
-    gke_replicas_factor = simulation_parameters.get("gke_replicas_factor", 10)
-    user_interactions_per_day = simulation_parameters.get("user_interactions_per_day", 57.0)
-    user_interactions_per_second = user_interactions_per_day/(24*60*60)
-    # --- Step 3: Initialize users by country ---
-    print("--------------------------------")
-    print("Initializing users by country...")
-    keys = list(country_distribution)
-    for country in keys:
-        weight = country_distribution[country]
-        n_users_in_country = int(weight * users_population_fraction / gke_replicas_factor)
-        if n_users_in_country == 0:
-            del country_distribution[country]
-            continue
-        USERS_BY_COUNTRY[country] = [fake.uuid4() for _ in range(n_users_in_country)]
-        GLOBAL_RATE_MAXIMUM += n_users_in_country * user_interactions_per_second
-        # Report
-        print(f"Initialized {country}: {n_users_in_country} users")
-    print("--------------------------------")
-    print(f"GLOBAL_RATE_MAXIMUM: {GLOBAL_RATE_MAXIMUM}", flush=True)
-    # Initialize global timestamp
-    GLOBAL_TIMESTAMP_MICROS = get_current_timestamp_micros()
-    GLOBAL_TIMESTAMP_HOUR = get_current_hour()
-    # HARD-CODED CONTINUE FROM LAST BIGQUERY RECORD
-    GLOBAL_TIMESTAMP_MICROS = 1760854441420750  # Last record: "2025-10-19 06:14:01.420750 UTC"
-    GLOBAL_TIMESTAMP_HOUR = 6.233727986111111  # Based on time above
-
-    # Start publishing messages
-    publish_messages_batch(project_id, topic_name, config)
-
-if __name__ == "__main__":
-    main()
+"""
+Google Cloud Pub/Sub Data Publisher for App Store Simulation.
+
+This module provides functionality to generate and publish simulated app store user interaction
+events to Google Cloud Pub/Sub. It supports configurable data profiles, event types, and
+publishing rates for testing and development purposes.
+
+The module generates realistic mock data including:
+- User search queries
+- App reviews and ratings
+- In-app purchases
+- Device and OS information
+- Geographic distribution
+
+Example:
+    python 01_publisher_initial.py --config publisher_config.json
+
+Dependencies:
+    - google-cloud-pubsub
+    - faker
+    - argparse
+    - json
+    - time
+    - random
+    - numpy
+    - numba
+    - orjson
+
+Author: App Store Simulation Team
+License: MIT
+"""
+
+import argparse
+import collections
+import json
+import multiprocessing
+import orjson
+import os
+import time
+import datetime
+import pytz
+import math
+import random
+from bisect import bisect
+from itertools import accumulate
+from typing import Dict, Any, List, Tuple
+import numpy as np
+from numba import njit
+from faker import Faker
+from google.cloud import pubsub_v1
+
+# Global variables
+HOURLY_MODULATION_FACTORS = np.asarray([
+    0.272, 0.251, 0.230, 0.210, 0.190,
+    0.172, 0.155, 0.138, 0.123, 0.108,
+    0.095, 0.083, 0.072, 0.062, 0.054,
+    0.047, 0.041, 0.036, 0.033, 0.031,
+    0.030, 0.031, 0.033, 0.036, 0.041,
+    0.047, 0.054, 0.062, 0.072, 0.083,
+    0.095, 0.108, 0.123, 0.138, 0.155,
+    0.172, 0.190, 0.210, 0.230, 0.251,
+    0.273, 0.295, 0.318, 0.341, 0.365,
+    0.389, 0.414, 0.439, 0.464, 0.490,
+    0.515, 0.540, 0.566, 0.591, 0.616,
+    0.641, 0.665, 0.689, 0.712, 0.735,
+    0.758, 0.779, 0.800, 0.820, 0.840,
+    0.858, 0.875, 0.892, 0.907, 0.922,
+    0.935, 0.947, 0.958, 0.968, 0.976,
+    0.983, 0.989, 0.994, 0.997, 0.999,
+    1.000, 0.999, 0.997, 0.994, 0.989,
+    0.983, 0.976, 0.968, 0.958, 0.947,
+    0.935, 0.922, 0.907, 0.892, 0.875,
+    0.858, 0.840, 0.820, 0.800, 0.779,
+    0.758, 0.735, 0.712, 0.689, 0.665,
+    0.641, 0.616, 0.591, 0.566, 0.540,
+    0.515, 0.490, 0.464, 0.439, 0.414,
+    0.389, 0.365, 0.341, 0.318, 0.295,
+])  # Each hour broken into 5 segments -> 24*5=120 factors
+# Per-country user pools as tuples parallel to COUNTRY_LIST: the bisect in
+# generate_event already yields the country index, so the string-keyed dict
+# lookup and random.choice's _randbelow machinery both collapse into plain
+# sequence indexing. Sizes are cached alongside to avoid a len() per event.
+USER_POOLS = []
+USER_POOL_SIZES = []
+# Pre-generated fake.bs() strings, filled once in main(). Sized to a power of
+# two so selection is a single getrandbits(13) with no modulo.
+SEARCH_QUERY_POOL = []
+SEARCH_QUERY_POOL_SIZE = 8192
+# Per-country arrays materialized once in main(); COUNTRY_LIST stays a list
+# for cheap indexing, the weights/offsets become NumPy arrays (see main())
+# so the per-bin rebuild is a single vectorized expression.
+COUNTRY_LIST = []
+COUNTRY_BASE_WEIGHTS = []
+COUNTRY_TZ_BIN_OFFSETS = []
+# Cache for the modulated cumulative weights, keyed on the 120-bin hour:
+# HOURLY_MODULATION_FACTORS already discretizes the day, so the distribution
+# can only change when the bin does.
+_CACHED_HOUR_BIN = -1
+_CACHED_CUMULATIVE = []
+_CACHED_TOTAL = 0.0
+# The os_version field only has 2*4*6 = 48 possible values, so all of them
+# are pre-formatted here and one getrandbits draw replaces the two randint
+# calls, random.choice, and f-string formatting per event. Picks draw far
+# more bits than the table needs (getrandbits costs the same up to a word)
+# so the modulo fold-over bias is negligible.
+_OS_STRINGS = tuple(
+    f"{os_name} {major}.{minor}"
+    for os_name in ("iOS", "Android")
+    for major in range(12, 16)
+    for minor in range(6)
+)
+# Same trick for the app and in-app-purchase id namespaces: both are small
+# fixed integer ranges, so the ids are formatted once and picked by index
+# instead of paying randint (_randbelow) plus f-string per event.
+_APP_IDS = tuple(f"app_{i}" for i in range(1000, 10000))
+_IAP_IDS = tuple(f"iap_{i}" for i in range(100, 1000))
+# Static distributions prepared once in main() as (keys, cumulative) pairs
+EVENT_TYPE_KEYS = ()
+EVENT_TYPE_CUMULATIVE = []
+DEVICE_TYPE_KEYS = ()
+DEVICE_TYPE_CUMULATIVE = []
+GLOBAL_TIMESTAMP_MICROS = 0
+GLOBAL_RATE_MAXIMUM = 0.0
+# Simulation time advances as integer microseconds only. The hour-of-day bin
+# is derived from GLOBAL_TIMESTAMP_MICROS plus this offset (set in main()),
+# so there is no parallel float hour accumulator to drift over billions of
+# += dt/3600 updates. One bin spans 12 minutes of simulated time.
+_HOUR_OFFSET_MICROS = 0
+_MICROS_PER_BIN = 12 * 60 * 1_000_000
+# Number of publisher processes this pod runs (set in initialize_worker_state).
+# Generation is pure-Python and GIL-bound, so one process per core scales the
+# throughput where threads cannot; each worker owns 1/N_WORKERS of the users
+# and of the publishing-rate budget.
+N_WORKERS = 1
+
+# Initialize Faker for generating mock data
+fake = Faker()
+
+# NumPy generator for bulk draws (PCG64; its exponential uses the ziggurat
+# method, several times faster per sample than random.expovariate)
+_NP_RNG = np.random.default_rng()
+
+# Pool of pre-drawn exponential inter-arrival times at GLOBAL_RATE_MAXIMUM.
+# Valid because the maximum rate is fixed after startup; thinning handles the
+# time-varying part. _INV_RATE (the mean inter-arrival time) is bound once in
+# main() so refills skip the division entirely.
+_DT_POOL = []
+_DT_POOL_SIZE = 65536
+_INV_RATE = 0.0
+
+def next_exponential_dt() -> float:
+    """
+    Get the next exponential inter-arrival time (seconds) at the maximum rate.
+
+    Refills in batches of 65536 from the NumPy ziggurat sampler, so the
+    per-event cost is a list pop instead of a log() per draw.
+    """
+    if not _DT_POOL:
+        _DT_POOL.extend(_NP_RNG.exponential(_INV_RATE, size=_DT_POOL_SIZE).tolist())
+    return _DT_POOL.pop()
+
+# Ring of pre-formatted 32-char hex ids: one os.urandom syscall per 4096 ids
+# instead of one per id, and bytes.hex() instead of UUID.__init__ + str().
+_UUID_POOL = []
+_UUID_BATCH_SIZE = 4096
+
+def next_uuid() -> str:
+    """
+    Get a random 128-bit id as a 32-character hex string.
+
+    Draws entropy in batches of 4096 ids with a single os.urandom call and
+    formats via bytes.hex, amortizing the syscall and skipping the stdlib
+    UUID object construction entirely.
+    """
+    if not _UUID_POOL:
+        buf = os.urandom(16 * _UUID_BATCH_SIZE)
+        _UUID_POOL.extend(buf[i*16:(i+1)*16].hex() for i in range(_UUID_BATCH_SIZE))
+    return _UUID_POOL.pop()
+
+# Bound C-level formatter for 64-bit session ids: sessions don't need the
+# 128 bits of entropy an event id gets, and one getrandbits(64) plus this
+# printf-style format is far cheaper than the urandom pool.
+_to_hex16 = '%016x'.__mod__
+
+# Tehran's UTC offset, resolved once at import: pytz.timezone() walks the tz
+# database on every call, which is far too slow for anything near a hot path.
+# Iran has no DST since 2022, so a fixed offset is exact.
+_TEHRAN_OFFSET_SECONDS = pytz.timezone("Asia/Tehran").utcoffset(datetime.datetime.utcnow()).total_seconds()
+
+def get_current_timestamp_micros() -> int:
+    """
+    Get the current timestamp in microseconds since epoch.
+    """
+    return int(time.time() * 1_000_000)
+
+def get_current_hour() -> float:
+    """
+    Get the current hour in the timezone of Iran.
+
+    Computed directly from the UTC epoch with the cached offset; the
+    continuous float hour is discretized downstream by the 120-bin lookup.
+    """
+    t = time.time() + _TEHRAN_OFFSET_SECONDS
+    return ((t // 60) % (24 * 60)) / 60.0
+
+def user_daily_activity_pattern(hour: float) -> float:
+    """
+    Get the user's daily activity pattern based on the hour.
+    """
+    # Discretized to reduce computation time
+    # Continiuous modulation: modulation = 0.03 + 0.97 * (1+math.cos( (hour-16) * (2*math.pi/24) ))/2
+    # Discrete modulation   : modulation = HOURLY_MODULATION_FACTORS[int((hour%24)*5)]
+    modulation = HOURLY_MODULATION_FACTORS[int( (hour%24)*5 )]
+    return modulation
+
+@njit(cache=True)
+def _modulated_cumulative_kernel(base_weights: np.ndarray, tz_bin_offsets: np.ndarray,
+                                 mod_factors: np.ndarray, hour_bin: int) -> np.ndarray:
+    """
+    Fused modulation + cumulative-sum kernel for one hour bin.
+
+    A single machine-code pass over the country arrays replaces the NumPy
+    gather/multiply/cumsum chain (three temporaries, three loops); with
+    cache=True the compiled kernel is reused across container restarts.
+    """
+    n = base_weights.size
+    out = np.empty(n)
+    acc = 0.0
+    for i in range(n):
+        acc += base_weights[i] * mod_factors[(hour_bin + tz_bin_offsets[i]) % 120]
+        out[i] = acc
+    return out
+
+def generate_time_modulated_weights() -> Tuple[List[float], float]:
+    """
+    Get time-modulated cumulative weights for the countries.
+    
+    This function uses the country's timezone to modulate the weights of the countries.
+    The cumulative weights are cached on the 120-bin hour of the simulation clock:
+    HOURLY_MODULATION_FACTORS already discretizes the day at that resolution, so the
+    distribution can only change when the bin does (~every 12 simulated minutes),
+    and every event in between reuses the cached list.
+    
+    Returns:
+        A tuple of (cumulative, total) where `cumulative` are the cumulative
+        modulated weights parallel to COUNTRY_LIST and `total` is their sum
+        (used for the thinning step).
+    """
+    global _CACHED_HOUR_BIN, _CACHED_CUMULATIVE, _CACHED_TOTAL
+    # --- Step 1: Get the current hour bin (pure integer arithmetic) ---
+    hour_bin = ((GLOBAL_TIMESTAMP_MICROS + _HOUR_OFFSET_MICROS) // _MICROS_PER_BIN) % 120
+    if hour_bin == _CACHED_HOUR_BIN:
+        return _CACHED_CUMULATIVE, _CACHED_TOTAL
+    # --- Step 2: Rebuild the cumulative time-modulated weights (njit kernel) ---
+    # The result goes back to a plain list because bisect on a list beats
+    # indexing into an ndarray per event.
+    _CACHED_CUMULATIVE = _modulated_cumulative_kernel(
+        COUNTRY_BASE_WEIGHTS, COUNTRY_TZ_BIN_OFFSETS, HOURLY_MODULATION_FACTORS, hour_bin
+    ).tolist()
+    _CACHED_TOTAL = _CACHED_CUMULATIVE[-1]
+    _CACHED_HOUR_BIN = hour_bin
+    # --- Step 3: Return the time-modulated weights ---
+    return _CACHED_CUMULATIVE, _CACHED_TOTAL
+
+def get_weighted_choice(distribution: Dict[str, float]) -> str:
+    """
+    Select a key from a dictionary based on its weighted distribution.
+    
+    This function uses random.choices to select items based on their probability weights.
+    The values in the dictionary should sum to 1.0 for proper probability distribution.
+    
+    Args:
+        distribution: A dictionary where keys are the items to choose
+                     and values are their probabilities (should sum to 1.0).
+                     
+    Returns:
+        The chosen key based on weighted random selection.
+        
+    Raises:
+        ValueError: If the distribution dictionary is empty.
+        
+    Example:
+        >>> dist = {"A": 0.6, "B": 0.4}
+        >>> get_weighted_choice(dist)
+        "A"  # 60% chance
+    """
+    if not distribution:
+        raise ValueError("Distribution dictionary cannot be empty")
+    
+    choices, weights = zip(*distribution.items())
+    return random.choices(choices, weights=weights, k=1)[0]
+
+def prepare_cumulative(distribution: Dict[str, float]) -> Tuple[tuple, List[float]]:
+    """
+    Convert a {key: weight} distribution into (keys, cumulative) for fast_choice.
+    """
+    keys, weights = zip(*distribution.items())
+    return keys, list(accumulate(weights))
+
+def fast_choice(keys: tuple, cumulative: List[float]) -> str:
+    """
+    Select a key using precomputed cumulative weights.
+    
+    Equivalent to get_weighted_choice but without re-unpacking the distribution
+    dict or paying random.choices' per-call overhead: one uniform draw and a
+    binary search on the cumulative list prepared at startup.
+    """
+    return keys[bisect(cumulative, random.random() * cumulative[-1])]
+
+def generate_event() -> Dict[str, Any]:
+    """
+    Generate a single user interaction event.
+
+    Creates realistic mock data for app store user interactions including app opens,
+    searches, installs, reviews, in-app purchases, app closes, and uninstalls.
+    All configured distributions are read from the module-level state prepared
+    by initialize_worker_state, so the hot path never walks the config dict.
+
+    Returns:
+        A dictionary representing the user interaction event with the following structure:
+        - event_id: Unique UUID for the event
+        - event_timestamp: Simulation time as integer epoch microseconds
+        - user_id: Unique UUID for the user
+        - session_id: Random 64-bit session id as a 16-character hex string
+        - event_type: Type of interaction (app_open, search, app_install, review_submit,
+                     in_app_purchase, app_close, app_uninstall)
+        - app_id: Random app identifier
+        - device_type: Device type based on distribution
+        - os_version: Operating system and version
+        - country_code: Country code based on distribution
+        - event_details: Dict with event-specific details, or None for event
+                        types that carry none
+
+    Example:
+        >>> event = generate_event()
+        >>> event["event_type"]
+        "search"
+    """
+    global GLOBAL_TIMESTAMP_MICROS
+    # Bind the hot RNG methods to locals: CPython resolves locals by array
+    # index, so each call skips a LOAD_GLOBAL + LOAD_ATTR pair.
+    _rand = random.random
+    _rbits = random.getrandbits
+    _randint = random.randint
+    #########################################
+    # --- Poisson distribution for events --- #
+    #########################################
+    GLOBAL_TIMESTAMP_MICROS += int(next_exponential_dt()*1_000_000)
+
+    #########################
+    # --- Country code --- #
+    #########################
+    country_cumulative, country_modulated_sum = generate_time_modulated_weights()
+    # Thinning step: accept/reject an event!
+    if _rand() > (country_modulated_sum/GLOBAL_RATE_MAXIMUM):
+        return None
+    # Inverse-CDF sampling on the cached cumulative weights: one uniform draw
+    # plus a binary search, instead of rebuilding a dict for random.choices.
+    country_idx = bisect(country_cumulative, _rand() * country_modulated_sum)
+    country_code = COUNTRY_LIST[country_idx]
+    # getrandbits(32) % size instead of random.choice: pools are tiny next to
+    # 2**32 so the modulo bias is negligible, and it skips _randbelow's
+    # rejection loop and the dict lookup by country string.
+    user_id = USER_POOLS[country_idx][_rbits(32) % USER_POOL_SIZES[country_idx]]
+
+    #########################
+    # --- Event type ---    #
+    #########################
+    event_type = fast_choice(EVENT_TYPE_KEYS, EVENT_TYPE_CUMULATIVE)
+
+    # Only three event types carry details; the rest ship None so no empty
+    # dict is allocated (and serialized) per event.
+    event_details_obj = None
+    if event_type == "search":
+        event_details_obj = {"search_query": SEARCH_QUERY_POOL[_rbits(13)]}
+    elif event_type == "review_submit":
+        event_details_obj = {"rating": _randint(1, 5)}
+    elif event_type == "in_app_purchase":
+        # Prices live on a 9901-value integer cent grid (0.99..99.99), so one
+        # getrandbits draw plus a division replaces uniform() and round().
+        event_details_obj = {
+            "item_id": _IAP_IDS[_rbits(14) % 900],
+            "price_usd": (99 + _rbits(28) % 9901) / 100.0,
+        }
+
+    #########################
+    # --- Current timestamp --- #
+    #########################
+    current_timestamp = get_current_timestamp_micros()
+
+    event = {
+        "generation_timestamp": current_timestamp,
+        "event_id": next_uuid(),
+        "event_timestamp": GLOBAL_TIMESTAMP_MICROS,
+        "user_id": user_id,
+        "session_id": _to_hex16(_rbits(64)),
+        "event_type": event_type,
+        "app_id": _APP_IDS[_rbits(27) % 9000],
+        "device_type": fast_choice(DEVICE_TYPE_KEYS, DEVICE_TYPE_CUMULATIVE),
+        "os_version": _OS_STRINGS[_rbits(20) % 48],
+        "country_code": country_code,
+        # Native value: the outer orjson.dumps serializes it in the same pass,
+        # avoiding double encoding and escaped-quote bloat.
+        "event_details": event_details_obj
+    }
+    return event
+
+def publish_messages_batch(project_id: str, topic_name: str, config: Dict[str, Any]) -> None:
+    """
+    Generate and publish messages to a Pub/Sub topic using automatic batching.
+    
+    This function continuously generates mock app store events and publishes them to
+    the specified Google Cloud Pub/Sub topic. It uses the client library's automatic
+    batching for optimal performance and handles publish callbacks for monitoring
+    success/failure rates.
+    
+    The publisher will collect messages for up to 50 ms or until 1000 messages
+    are collected, whichever comes first, before publishing the batch. Publish-
+    side flow control blocks the generator when too many messages are in flight.
+    
+    Args:
+        project_id: Google Cloud project ID where the Pub/Sub topic exists.
+        topic_name: Name of the Pub/Sub topic to publish messages to.
+        config: Publisher configuration containing event distributions and publishing settings.
+               Expected to have 'generation_rate' key with 'events_per_second' and 
+               'randomness_factor' for rate control.
+    
+    Raises:
+        Exception: Catches and logs any unexpected errors during publishing.
+        
+    Note:
+        This function runs indefinitely until interrupted. Use Ctrl+C to stop.
+        The function will print status updates every 1000 published messages.
+    """
+    # --- Batching Settings ---
+    # 1000 messages / 50ms: larger batches amortize the gRPC framing while
+    # the short delay threshold keeps batches from idling a full second
+    # before they ship (the old 1s max_latency let tail latency dominate).
+    batch_settings = pubsub_v1.types.BatchSettings(
+        max_messages=1000,
+        max_bytes=8 * 1024 * 1024,  # stay under the 10MB request ceiling
+        max_latency=0.05,  # 50 ms
+    )
+    # Block the generator if too many messages are in flight, capping memory
+    # if the broker ever falls behind instead of queueing without bound.
+    publisher_options = pubsub_v1.types.PublisherOptions(
+        flow_control=pubsub_v1.types.PublishFlowControl(
+            message_limit=20_000,
+            byte_limit=256 * 1024 * 1024,
+            limit_exceeded_behavior=pubsub_v1.types.LimitExceededBehavior.BLOCK,
+        ),
+    )
+    publisher = pubsub_v1.PublisherClient(batch_settings, publisher_options)
+    topic_path = publisher.topic_path(project_id, topic_name)
+
+    print(f"Publisher starting for project '{project_id}' on topic '{topic_name}'.")
+    print(f"Generating data based on profile: {config.get('description')}")
+    print(f"Using automatic batching (max {batch_settings.max_messages} messages or {batch_settings.max_latency}s latency).")
+    
+    rate_config = config.get("generation_rate", {})
+    base_rate = rate_config.get("events_per_second", 0)  # 0 means no rate control
+    randomness = rate_config.get("randomness_factor", 0.1)
+
+    # Batch pacing: a per-event time.sleep has 10-100us wakeup jitter and a
+    # syscall each time, so the producer was serialized behind the scheduler.
+    # Instead, publish bursts of PACING_COUNT events and sleep once for the
+    # remainder of the burst's time budget; the average rate is unchanged
+    # (no more than 445 req/sec when rate control is off).
+    PACING_COUNT = 256
+    # The rate budget is per pod; each worker process paces at its share.
+    pace_interval = PACING_COUNT / ((base_rate if base_rate > 0 else 445.0) / N_WORKERS)
+    events_since_pace = 0
+    pace_t0 = time.perf_counter()
+    
+    # Publish results are accounted by draining futures at batch boundaries:
+    # attaching a Python callback to every future made the gRPC threads call
+    # back into Python per message and kept each future alive across threads.
+    published_count = 0
+    failed_count = 0
+    last_status_count = 0
+    pending = collections.deque()
+
+    try:
+        while True:
+            # Generate a single event
+            event_data = generate_event()
+            if event_data is None:
+                continue
+
+            # Serialize to UTF-8 bytes; orjson's C encoder is several times
+            # faster than stdlib json and already returns bytes.
+            data = orjson.dumps(event_data)
+
+            # The publish() method is non-blocking. It returns a future.
+            # The client library handles batching in a background thread.
+            pending.append(publisher.publish(topic_path, data))
+
+            # Periodically drain the oldest half of the pending futures; by
+            # then they have long completed, so .result() is just bookkeeping
+            # plus backpressure if the broker ever falls behind.
+            if len(pending) >= 5000:
+                for _ in range(len(pending) // 2):
+                    try:
+                        pending.popleft().result(timeout=30)
+                        published_count += 1
+                    except Exception as e:
+                        failed_count += 1
+                        print(f"Failed to publish message: {e}")
+                # Status print lives here, where the count changes: checking
+                # it per event re-printed the same line for a whole drain
+                # cycle whenever the count landed on a 100k multiple.
+                if published_count - last_status_count >= 100_000:
+                    print(f"Published {published_count} messages so far...", flush=True)
+                    last_status_count = published_count
+
+            # Control the publishing rate (once per burst, not per event)
+            events_since_pace += 1
+            if events_since_pace >= PACING_COUNT:
+                if base_rate > 0:
+                    interval = pace_interval * (1 + random.uniform(-randomness, randomness))
+                else:
+                    interval = pace_interval
+                elapsed = time.perf_counter() - pace_t0
+                if interval > elapsed:
+                    time.sleep(interval - elapsed)
+                events_since_pace = 0
+                pace_t0 = time.perf_counter()
+
+    except KeyboardInterrupt:
+        print(f"\nPublisher stopped by user. Total published: {published_count}, failed: {failed_count}")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        print(f"Total published: {published_count}, failed: {failed_count}")
+
+
+def main() -> None:
+    """
+    Main entry point for the Pub/Sub Data Publisher.
+    
+    Parses command line arguments, loads the configuration file, validates
+    required settings, and starts the message publishing process.
+    
+    Command Line Arguments:
+        --config: Path to the publisher JSON configuration file (required).
+    
+    Configuration File Requirements:
+        - gcp_project_id: Google Cloud project ID
+        - pubsub_topic_name: Name of the Pub/Sub topic
+        - event_type: Event type distribution configuration
+        - device_type: Device type distribution configuration
+        - country_infos: Country code distribution configuration
+        - generation_rate: Rate control settings (optional)
+        - description: Human-readable description of the data profile
+    
+    Example Configuration:
+        {
+            "gcp_project_id": "my-project",
+            "pubsub_topic_name": "app-store-events",
+            "event_type": {
+                "distribution": {
+                    "app_open": 0.4,
+                    "search": 0.3,
+                    "app_install": 0.15,
+                    "review_submit": 0.05,
+                    "in_app_purchase": 0.05,
+                    "app_close": 0.04,
+                    "app_uninstall": 0.01
+                }
+            },
+            "device_type": {
+                "distribution": {"phone": 0.8, "tablet": 0.15, "desktop": 0.05}
+            },
+            "country_infos": {
+                "distribution": {"US": 0.3, "CA": 0.3, "IR": 0.4}
+            },
+            "generation_rate": {
+                "events_per_second": 0,
+                "randomness_factor": 0.2
+            },
+            "description": "Standard app store traffic profile"
+        }
+    
+    Raises:
+        FileNotFoundError: If the configuration file doesn't exist.
+        json.JSONDecodeError: If the configuration file contains invalid JSON.
+        SystemExit: If required configuration values are missing.
+    """
+    parser = argparse.ArgumentParser(
+        description="Pub/Sub Data Publisher for App Store Simulation",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python 01_publisher_initial.py --config publisher_config.json
+  python 01_publisher_initial.py --config /path/to/config.json
+        """
+    )
+    parser.add_argument(
+        "--config",
+        required=True,
+        help="Path to the publisher JSON configuration file.",
+    )
+    args = parser.parse_args()
+
+    # Load publisher configuration
+    try:
+        with open(args.config, 'r') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        print(f"Error: Configuration file not found at {args.config}")
+        return
+    except json.JSONDecodeError:
+        print(f"Error: Could not decode JSON from {args.config}")
+        return
+
+    project_id = config.get("gcp_project_id")
+    topic_name = config.get("pubsub_topic_name")
+
+    if not project_id or not topic_name:
+        print("Error: 'gcp_project_id' and 'pubsub_topic_name' must be set in the config file.")
+        return
+
+    # --- Start the publisher workers ---
+    simulation_parameters = config.get("simulation_parameters", {})
+    n_workers = int(simulation_parameters.get("worker_processes", os.cpu_count() or 1))
+    if n_workers <= 1:
+        initialize_worker_state(config, 1)
+        publish_messages_batch(project_id, topic_name, config)
+        return
+    # Event generation is pure-Python and therefore GIL-bound: one process
+    # per core is the only way to scale it on a multi-core pod. Workers are
+    # fully independent; the pod-level budget is preserved because each one
+    # gets 1/n_workers of the users and of the pacing budget.
+    print(f"Spawning {n_workers} publisher worker processes...")
+    workers = [
+        multiprocessing.Process(
+            target=_publisher_worker,
+            args=(project_id, topic_name, config, n_workers),
+        )
+        for _ in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        print("\nStopping publisher workers...")
+        for worker in workers:
+            worker.terminate()
+
+def initialize_worker_state(config: Dict[str, Any], n_workers: int) -> None:
+    """
+    Build this worker's simulation state from the configuration.
+
+    Populates the per-country user pools, the precomputed cumulative
+    distributions, the rate maximum and the simulation clock. Each worker
+    process holds 1/n_workers of the pod's users (and therefore of its
+    event rate), mirroring how replicas already split the global population
+    via gke_replicas_factor.
+
+    Args:
+        config: The loaded publisher configuration.
+        n_workers: Total number of publisher processes in this pod.
+    """
+    global GLOBAL_TIMESTAMP_MICROS, _HOUR_OFFSET_MICROS, GLOBAL_RATE_MAXIMUM, _INV_RATE, N_WORKERS
+    global EVENT_TYPE_KEYS, EVENT_TYPE_CUMULATIVE, DEVICE_TYPE_KEYS, DEVICE_TYPE_CUMULATIVE
+    global COUNTRY_BASE_WEIGHTS, COUNTRY_TZ_BIN_OFFSETS
+
+    N_WORKERS = n_workers
+    # Initialize users by country
+    # --- Step 1: Get the country distribution ---
+    country_infos = config.get("country_infos", {})
+    country_distribution = country_infos.get("distribution", {})
+    country_timezone = country_infos.get("timezone", {})
+    # --- Step 2: Get the simulation parameters ---
+    simulation_parameters = config.get("simulation_parameters", {})
+    users_population_fraction = simulation_parameters.get("users_population_fraction", 0.001)
+    gke_replicas_factor = simulation_parameters.get("gke_replicas_factor", 10)
+    user_interactions_per_day = simulation_parameters.get("user_interactions_per_day", 57.0)
+    user_interactions_per_second = user_interactions_per_day/(24*60*60)
+    # --- Step 3: Initialize users by country ---
+    print("--------------------------------")
+    print("Initializing users by country...")
+    keys = list(country_distribution)
+    for country in keys:
+        weight = country_distribution[country]
+        # Drop a country only when the whole pod's share rounds to zero, as
+        # the single-process version did; otherwise the emitted country set
+        # would shrink with the node's core count. Surviving per-worker
+        # pools are floored at one user.
+        n_users_in_pod = int(weight * users_population_fraction / gke_replicas_factor)
+        if n_users_in_pod == 0:
+            del country_distribution[country]
+            continue
+        n_users_in_country = max(1, n_users_in_pod // n_workers)
+        # next_uuid instead of fake.uuid4: Faker's provider dispatch is ~20x
+        # the cost of a hex slice, which matters when pools hold millions of
+        # users; Faker stays only for the search-query pool below.
+        USER_POOLS.append(tuple(next_uuid() for _ in range(n_users_in_country)))
+        USER_POOL_SIZES.append(n_users_in_country)
+        GLOBAL_RATE_MAXIMUM += n_users_in_country * user_interactions_per_second
+        # Parallel arrays for the cached cumulative-weight sampling
+        COUNTRY_LIST.append(country)
+        COUNTRY_BASE_WEIGHTS.append(weight)
+        COUNTRY_TZ_BIN_OFFSETS.append(int(round(country_timezone[country] * 5)))
+        # Report
+        print(f"Initialized {country}: {n_users_in_country} users")
+    print("--------------------------------")
+    # Freeze the per-country lists into arrays for the vectorized rebuild
+    COUNTRY_BASE_WEIGHTS = np.asarray(COUNTRY_BASE_WEIGHTS)
+    COUNTRY_TZ_BIN_OFFSETS = np.asarray(COUNTRY_TZ_BIN_OFFSETS, dtype=np.int64)
+    print(f"GLOBAL_RATE_MAXIMUM: {GLOBAL_RATE_MAXIMUM}", flush=True)
+    # The rate is fixed from here on; bind its inverse for the dt-pool refills
+    _INV_RATE = 1.0 / GLOBAL_RATE_MAXIMUM
+    # Pre-generate the search-query pool: fake.bs() is far too slow to call
+    # per event, and simulated queries need not be unique.
+    SEARCH_QUERY_POOL.extend(fake.bs() for _ in range(SEARCH_QUERY_POOL_SIZE))
+    # Precompute the static cumulative distributions for fast_choice
+    EVENT_TYPE_KEYS, EVENT_TYPE_CUMULATIVE = prepare_cumulative(config.get("event_type", {}).get("distribution", {}))
+    DEVICE_TYPE_KEYS, DEVICE_TYPE_CUMULATIVE = prepare_cumulative(config.get("device_type", {}).get("distribution", {}))
+    # Initialize global timestamp
+    GLOBAL_TIMESTAMP_MICROS = get_current_timestamp_micros()
+    start_hour = get_current_hour()
+    # HARD-CODED CONTINUE FROM LAST BIGQUERY RECORD
+    GLOBAL_TIMESTAMP_MICROS = 1760854441420750  # Last record: "2025-10-19 06:14:01.420750 UTC"
+    start_hour = 6.233727986111111  # Based on time above
+    # Anchor the hour-of-day derivation: from here on the hour bin is computed
+    # from GLOBAL_TIMESTAMP_MICROS alone.
+    _HOUR_OFFSET_MICROS = int(start_hour * 3600 * 1_000_000) - GLOBAL_TIMESTAMP_MICROS
+
+def _publisher_worker(project_id: str, topic_name: str, config: Dict[str, Any], n_workers: int) -> None:
+    """
+    Entry point for one publisher process.
+
+    Reseeds both RNGs first: forked children inherit the parent's generator
+    state, and without a reseed every worker would emit an identical event
+    stream. Each worker then builds its own user pools and opens its own
+    PublisherClient (gRPC channels cannot be shared across processes).
+    """
+    global _NP_RNG
+    random.seed()
+    _NP_RNG = np.random.default_rng()
+    initialize_worker_state(config, n_workers)
+    publish_messages_batch(project_id, topic_name, config)
+
+if __name__ == "__main__":
+    main()
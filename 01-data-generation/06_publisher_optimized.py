@@ -0,0 +1,677 @@
+"""
+Google Cloud Pub/Sub Data Publisher for App Store Simulation.
+
+This module provides functionality to generate and publish simulated app store user interaction
+events to Google Cloud Pub/Sub. It supports configurable data profiles, event types, and
+publishing rates for testing and development purposes.
+
+This version batches event generation: instead of building one event per call, all the
+categorical fields (country, event type, device type) are drawn N at a time with NumPy
+vectorized weighted sampling (`np.searchsorted` on precomputed cumulative distributions),
+removing the per-event Python sampling overhead that dominated CPU before the network.
+
+The module generates realistic mock data including:
+- User search queries
+- App reviews and ratings
+- In-app purchases
+- Device and OS information
+- Geographic distribution
+
+Example:
+    python 06_publisher_optimized.py --config publisher_config.json
+
+Dependencies:
+    - google-cloud-pubsub
+    - faker
+    - numpy
+    - numba
+    - orjson
+    - argparse
+    - json
+    - time
+    - uuid
+    - random
+
+Author: App Store Simulation Team
+License: MIT
+"""
+
+import argparse
+import collections
+import itertools
+import os
+import json
+import orjson
+import queue
+import threading
+import time
+import datetime
+import math
+import uuid
+import random
+from bisect import bisect_right
+from typing import Dict, Any, List, Tuple
+from zoneinfo import ZoneInfo
+import numpy as np
+from numba import njit
+from faker import Faker
+from google.cloud import pubsub_v1
+
+# Global variables
+USERS_BY_COUNTRY = {}
+SEARCH_QUERY_POOL = []  # Pre-generated fake.bs() strings; filled once in main()
+SEARCH_QUERY_POOL_SIZE = 10_000
+GLOBAL_TIMESTAMP_MICROS = 0
+GLOBAL_TIMESTAMP_HOUR = 0.0
+GLOBAL_RATE_MAXIMUM = 0.0
+EVENTS_PER_BATCH = 500  # Candidate events drawn per vectorized batch
+STATUS_INTERVAL_SECONDS = 60  # How often the publish loop reports progress
+PROBE_INTERVAL = 1000  # Retain every Nth publish future as a sampled health probe
+
+# The id/version namespaces are tiny, so every possible string is formatted
+# once at import and the hot path only indexes into these tables.
+APP_IDS = [f"app_{i}" for i in range(1000, 10000)]
+IAP_IDS = [f"iap_{i}" for i in range(100, 1000)]
+OS_VERSIONS = [
+    f"{os_name} {major}.{minor}"
+    for os_name in ("iOS", "Android")
+    for major in range(12, 16)
+    for minor in range(6)
+]  # 2*4*6 = 48 combinations
+# NumPy copies of the tables so a batch of draws is one fancy-index gather
+APP_IDS_ARRAY = np.array(APP_IDS)
+OS_VERSIONS_ARRAY = np.array(OS_VERSIONS)
+
+# Initialize Faker for generating mock data
+fake = Faker()
+
+# Single NumPy generator shared by all vectorized draws
+RNG = np.random.default_rng()
+
+def get_current_timestamp_micros() -> int:
+    """
+    Get the current timestamp in microseconds since epoch.
+    """
+    return int(time.time() * 1_000_000)
+
+# Timezone object hoisted to module scope: constructing it per call does
+# repeated registry lookups for a value that never changes. zoneinfo is
+# C-backed stdlib (3.9+), so no pytz dependency or .localize() ritual.
+_TEHRAN_TZ = ZoneInfo("Asia/Tehran")
+_CURRENT_HOUR_BUCKET = -1
+_CURRENT_HOUR_VALUE = 0.0
+
+def get_current_hour() -> float:
+    """
+    Get the current hour in the timezone of Iran.
+
+    The result only changes at 0.1h granularity, so it is cached on a 360-second
+    wall-clock bucket; only the first call in a bucket pays for the datetime
+    construction and timezone conversion.
+    """
+    global _CURRENT_HOUR_BUCKET, _CURRENT_HOUR_VALUE
+    bucket = int(time.time() // 360)  # 0.1h buckets
+    if bucket != _CURRENT_HOUR_BUCKET:
+        now = datetime.datetime.now(tz=_TEHRAN_TZ)
+        _CURRENT_HOUR_BUCKET = bucket
+        _CURRENT_HOUR_VALUE = now.hour + round(now.minute/60, 1)
+    return _CURRENT_HOUR_VALUE
+
+@njit(cache=True, fastmath=True)
+def user_daily_activity_pattern(hours: np.ndarray) -> np.ndarray:
+    """
+    Get the user's daily activity pattern for an array of (local) hours.
+
+    JIT-compiled with Numba so the continuous cosine modulation is evaluated as one
+    vectorized libm call over all countries; the earlier publishers discretized this
+    into a 120-entry lookup table to keep the per-event Python cost down, which is no
+    longer needed once the loop leaves the interpreter.
+    """
+    # modulation = 0.03 + 0.97 * (1+cos( (hour-16) * (2*pi/24) ))/2
+    return 0.03 + 0.485 * (1 + np.cos((hours - 16) * (2 * np.pi / 24)))
+
+# Cache for the modulated country distribution: the modulation is smooth on the
+# hour, so recomputing more often than the 0.1h cache key is waste.
+_COUNTRY_CHOICES = None
+_COUNTRY_BASE_WEIGHTS = None
+_COUNTRY_TZ_OFFSETS = None
+_CACHED_HOUR = None
+_CACHED_CUMULATIVE = None
+_CACHED_TOTAL = 0.0
+
+def generate_time_modulated_weights() -> Tuple[np.ndarray, np.ndarray, float]:
+    """
+    Get time-modulated weights for each country based on the country's timezone.
+
+    This function uses the country's timezone to modulate the weights of the countries,
+    working entirely on the module-level arrays set up by initialize_country_arrays().
+    The result is memoized on the hour rounded to 0.1h: within a bucket the modulation
+    cannot change, so repeated calls reuse the cached cumulative weights instead of
+    recomputing the per-country modulation.
+
+    Returns:
+        A tuple of (choices, cumulative, total) where `choices` is the country code
+        array, `cumulative` the normalized cumulative modulated weights, and `total`
+        the unnormalized modulated weight sum (used for the thinning step).
+    """
+    global _CACHED_HOUR, _CACHED_CUMULATIVE, _CACHED_TOTAL
+    # --- Step 1: Get the current hour (cache key at 0.1h resolution) ---
+    current_hour = round(GLOBAL_TIMESTAMP_HOUR, 1)
+    if current_hour == _CACHED_HOUR:
+        return _COUNTRY_CHOICES, _CACHED_CUMULATIVE, _CACHED_TOTAL
+    # --- Step 2: Generate the time-modulated weights (vectorized, JIT-compiled) ---
+    modulated = _COUNTRY_BASE_WEIGHTS * user_daily_activity_pattern(current_hour + _COUNTRY_TZ_OFFSETS)
+    _CACHED_TOTAL = float(modulated.sum())
+    _CACHED_CUMULATIVE = np.cumsum(modulated) / _CACHED_TOTAL
+    _CACHED_HOUR = current_hour
+    # --- Step 3: Return the time-modulated weights ---
+    return _COUNTRY_CHOICES, _CACHED_CUMULATIVE, _CACHED_TOTAL
+
+def initialize_country_arrays(country_infos: Dict[str, Any]) -> None:
+    """
+    Materialize the per-country NumPy arrays from the loaded configuration.
+
+    Called once from main() after the config is loaded and pruned, so the hot
+    path never touches the configuration dicts.
+    """
+    global _COUNTRY_CHOICES, _COUNTRY_BASE_WEIGHTS, _COUNTRY_TZ_OFFSETS
+    country_distribution = country_infos.get("distribution", {})
+    country_timezone = country_infos.get("timezone", {})
+    _COUNTRY_CHOICES = np.array(list(country_distribution))
+    _COUNTRY_BASE_WEIGHTS = np.array(list(country_distribution.values()))
+    _COUNTRY_TZ_OFFSETS = np.array([country_timezone[c] for c in country_distribution])
+
+def get_weighted_choice(distribution: Dict[str, float]) -> str:
+    """
+    Select a key from a dictionary based on its weighted distribution.
+
+    This function selects items based on their probability weights via a
+    cumulative sum and binary search.
+    The values in the dictionary should sum to 1.0 for proper probability distribution.
+
+    Args:
+        distribution: A dictionary where keys are the items to choose
+                     and values are their probabilities (should sum to 1.0).
+
+    Returns:
+        The chosen key based on weighted random selection.
+
+    Raises:
+        ValueError: If the distribution dictionary is empty.
+
+    Example:
+        >>> dist = {"A": 0.6, "B": 0.4}
+        >>> get_weighted_choice(dist)
+        "A"  # 60% chance
+
+    Note:
+        For the small distributions used here (~3-7 entries) a plain
+        cumulative-sum + bisect is several times faster per draw than
+        random.choices, which pays argument validation and list-construction
+        overhead for k=1. Around N>=64 random.choices becomes competitive
+        again; the vectorized batch path covers those cases anyway.
+    """
+    if not distribution:
+        raise ValueError("Distribution dictionary cannot be empty")
+
+    choices, weights = zip(*distribution.items())
+    cumulative = list(itertools.accumulate(weights))
+    return choices[bisect_right(cumulative, random.random() * cumulative[-1])]
+
+def prepare_distribution(distribution: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert a {key: weight} distribution into arrays for vectorized sampling.
+
+    Args:
+        distribution: A dictionary mapping choices to their (unnormalized) weights.
+
+    Returns:
+        A tuple of (choices, cumulative) where `choices` is an array of keys and
+        `cumulative` is the normalized cumulative weight array ending at 1.0.
+    """
+    if not distribution:
+        raise ValueError("Distribution dictionary cannot be empty")
+    choices = np.array(list(distribution))
+    cumulative = np.cumsum(list(distribution.values()))
+    cumulative = cumulative / cumulative[-1]
+    return choices, cumulative
+
+def sample_categorical(choices: np.ndarray, cumulative: np.ndarray, n: int) -> np.ndarray:
+    """
+    Draw `n` weighted samples from a precomputed categorical distribution.
+
+    Uses `np.searchsorted` on the cumulative weights, i.e. vectorized inverse-CDF
+    sampling, which replaces `n` Python-level `random.choices` calls with one
+    binary-search pass over a contiguous array.
+
+    Args:
+        choices: Array of candidate values.
+        cumulative: Normalized cumulative weights for `choices` (ends at 1.0).
+        n: Number of samples to draw.
+
+    Returns:
+        An array of `n` sampled values.
+    """
+    return choices[np.searchsorted(cumulative, RNG.random(n), side="right")]
+
+def generate_events_batch(
+    n: int,
+    event_type_dist: Tuple[np.ndarray, np.ndarray],
+    device_type_dist: Tuple[np.ndarray, np.ndarray],
+) -> List[Dict[str, Any]]:
+    """
+    Generate a batch of user interaction events based on the configuration.
+
+    Simulates `n` candidate arrivals of the non-homogeneous Poisson process in one
+    vectorized pass: inter-arrival times, the thinning accept/reject step, and all
+    categorical fields (country, event type, device type) are drawn as NumPy arrays
+    up front, then only the accepted candidates are assembled into event dicts.
+
+    Args:
+        n: Number of Poisson candidates to simulate (accepted events will be fewer).
+        event_type_dist: Precomputed (choices, cumulative) arrays for event types.
+        device_type_dist: Precomputed (choices, cumulative) arrays for device types.
+
+    Returns:
+        A list of event dictionaries, one per accepted candidate, each with the same
+        structure as the single-event publishers (event_id, event_timestamp, user_id,
+        session_id, event_type, app_id, device_type, os_version, country_code,
+        event_details).
+    """
+    global GLOBAL_TIMESTAMP_MICROS, GLOBAL_TIMESTAMP_HOUR
+
+    #########################################
+    # --- Poisson distribution for events --- #
+    #########################################
+    dt_seconds = RNG.exponential(1.0/GLOBAL_RATE_MAXIMUM, size=n)
+    event_timestamps = GLOBAL_TIMESTAMP_MICROS + np.cumsum(dt_seconds * 1_000_000).astype(np.int64)
+    GLOBAL_TIMESTAMP_MICROS = int(event_timestamps[-1])
+    GLOBAL_TIMESTAMP_HOUR += float(dt_seconds.sum()) / 3600
+
+    #########################
+    # --- Country code --- #
+    #########################
+    country_choices, country_cumulative, country_modulated_sum = generate_time_modulated_weights()
+    # Thinning step: accept/reject candidates in bulk, before any field work!
+    accepted_indices = np.flatnonzero(
+        RNG.random(n) < (country_modulated_sum/GLOBAL_RATE_MAXIMUM)
+    )
+    n_accepted = accepted_indices.size
+    accepted_timestamps = event_timestamps[accepted_indices]
+
+    ####################################
+    # --- Per-field draws (SoA) ---    #
+    ####################################
+    # Struct-of-arrays: each field for the whole batch is drawn/built as one
+    # contiguous array or list, and only transposed into per-event dicts at the
+    # end. Only accepted candidates pay for field generation.
+    country_codes = sample_categorical(country_choices, country_cumulative, n_accepted)
+    event_types = sample_categorical(*event_type_dist, n_accepted)
+    device_types = sample_categorical(*device_type_dist, n_accepted)
+    app_ids = APP_IDS_ARRAY[RNG.integers(len(APP_IDS), size=n_accepted)]
+    os_versions = OS_VERSIONS_ARRAY[RNG.integers(len(OS_VERSIONS), size=n_accepted)]
+    event_ids = [uuid.uuid4().hex for _ in range(n_accepted)]
+    session_ids = [uuid.uuid4().hex for _ in range(n_accepted)]
+    # One bulk uniform draw replaces a random.choice (_randbelow and all) per
+    # event; only the per-country pool lookup stays in Python.
+    user_uniforms = RNG.random(n_accepted)
+    user_ids = []
+    for j, country in enumerate(country_codes):
+        pool = USERS_BY_COUNTRY[country]
+        user_ids.append(pool[int(user_uniforms[j] * len(pool))])
+
+    ####################################
+    # --- Event details (masked) ---   #
+    ####################################
+    # Details exist for three event types only; fill them via index masks so
+    # the branch on event_type runs once per mask, not once per event.
+    event_details_list = [{} for _ in range(n_accepted)]
+    search_indices = np.flatnonzero(event_types == "search")
+    query_indices = RNG.integers(len(SEARCH_QUERY_POOL), size=search_indices.size)
+    for k, j in enumerate(search_indices):
+        event_details_list[j]["search_query"] = SEARCH_QUERY_POOL[query_indices[k]]
+    review_indices = np.flatnonzero(event_types == "review_submit")
+    # np.int64 is not an int subclass, so cast ratings for serialization
+    for j, rating in zip(review_indices, RNG.integers(1, 6, size=review_indices.size)):
+        event_details_list[j]["rating"] = int(rating)
+    purchase_indices = np.flatnonzero(event_types == "in_app_purchase")
+    iap_indices = RNG.integers(len(IAP_IDS), size=purchase_indices.size)
+    prices = RNG.uniform(0.99, 99.99, size=purchase_indices.size).round(2)
+    for k, j in enumerate(purchase_indices):
+        event_details_list[j]["item_id"] = IAP_IDS[iap_indices[k]]
+        event_details_list[j]["price_usd"] = float(prices[k])
+
+    #########################
+    # --- Current timestamp --- #
+    #########################
+    current_timestamp = get_current_timestamp_micros()
+
+    # Transpose SoA -> AoS: one dict per accepted event
+    events = [
+        {
+            "generation_timestamp": current_timestamp,
+            "event_id": event_ids[j],
+            "event_timestamp": int(accepted_timestamps[j]),
+            "user_id": user_ids[j],
+            "session_id": session_ids[j],
+            "event_type": event_types[j],
+            "app_id": app_ids[j],
+            "device_type": device_types[j],
+            "os_version": os_versions[j],
+            "country_code": country_codes[j],
+            # Kept as a native dict: the outer orjson.dumps serializes it in the
+            # same pass, avoiding double encoding and escaped-quote bloat.
+            "event_details": event_details_list[j],
+        }
+        for j in range(n_accepted)
+    ]
+    return events
+
+def publish_messages_batch(
+    project_id: str,
+    topic_name: str,
+    config: Dict[str, Any],
+    event_type_dist: Tuple[np.ndarray, np.ndarray],
+    device_type_dist: Tuple[np.ndarray, np.ndarray],
+) -> None:
+    """
+    Generate and publish messages to a Pub/Sub topic using automatic batching.
+
+    This function continuously generates mock app store events in vectorized batches
+    and publishes them to the specified Google Cloud Pub/Sub topic. It uses the client
+    library's automatic batching for optimal performance and handles publish callbacks
+    for monitoring success/failure rates.
+
+    The publisher will collect messages for up to 50 ms or until 1000 messages
+    (9 MB) are collected, whichever comes first, before publishing the batch.
+
+    Args:
+        project_id: Google Cloud project ID where the Pub/Sub topic exists.
+        topic_name: Name of the Pub/Sub topic to publish messages to.
+        config: Publisher configuration containing event distributions and publishing settings.
+               Expected to have 'generation_rate' key with 'events_per_second' and
+               'randomness_factor' for rate control.
+        event_type_dist: Precomputed (choices, cumulative) arrays for event types.
+        device_type_dist: Precomputed (choices, cumulative) arrays for device types.
+
+    Raises:
+        Exception: Catches and logs any unexpected errors during publishing.
+
+    Note:
+        This function runs indefinitely until interrupted. Use Ctrl+C to stop.
+        The function will print status updates every 60 seconds.
+    """
+    # --- Batching Settings ---
+    # Sized to the SDK maxima (1000 messages / 10 MB per batch): events are
+    # small (<1 KB), so larger batches halve the per-batch RPC overhead. At
+    # high rates a batch fills in far under a second, so max_latency only
+    # needs to bound the flush of a trailing partial batch.
+    batch_settings = pubsub_v1.types.BatchSettings(
+        max_messages=1000,
+        max_bytes=9_000_000,
+        max_latency=0.05,  # 50 ms
+    )
+    # Connection-level parallelism: each PublisherClient multiplexes on a
+    # single gRPC channel, which caps throughput once per-message encode is
+    # cheap. Round-robin across several clients/channels lifts that ceiling.
+    simulation_parameters = config.get("simulation_parameters", {})
+    n_clients = simulation_parameters.get("publisher_clients", min(8, os.cpu_count() or 1))
+    publishers = [pubsub_v1.PublisherClient(batch_settings) for _ in range(n_clients)]
+    topic_paths = [publisher.topic_path(project_id, topic_name) for publisher in publishers]
+    client_indices = itertools.cycle(range(n_clients))
+
+    print(f"Publisher starting for project '{project_id}' on topic '{topic_name}' with {n_clients} clients.")
+    print(f"Generating data based on profile: {config.get('description')}")
+    print(f"Using automatic batching (max {batch_settings.max_messages} messages or {batch_settings.max_latency}s latency).")
+
+    rate_config = config.get("generation_rate", {})
+    base_rate = rate_config.get("events_per_second", 0)  # 0 means no rate control
+    randomness = rate_config.get("randomness_factor", 0.1)
+
+    # Health probes: tracking every future (even without callbacks) still
+    # costs an append plus a sweep per message. Since failures are rare and
+    # correlated (quota, auth, topic gone), it is enough to retain one future
+    # out of every PROBE_INTERVAL as a sampled probe; the published total is
+    # counted at publish-call time on the main thread.
+    published_count = 0
+    failed_probe_counter = itertools.count()
+    failed_probe_reads = 0
+    probe_buf = collections.deque(maxlen=1024)
+    probe_cycle = itertools.cycle(range(PROBE_INTERVAL))
+
+    def sweeper() -> None:
+        """
+        Periodically drain completed probe futures and tick the failure counter.
+
+        Only the oldest completed prefix is drained each pass; the main loop is
+        the only appender, so no locking is needed around the deque.
+        """
+        while True:
+            time.sleep(0.1)
+            while probe_buf and probe_buf[0].done():
+                future = probe_buf.popleft()
+                if future.exception() is not None:
+                    next(failed_probe_counter)
+                    print(f"Failed to publish message (sampled probe): {future.exception()}")
+
+    threading.Thread(target=sweeper, daemon=True).start()
+
+    def snapshot_failed_probes() -> int:
+        """
+        Read the failed-probe total; reading itertools.count consumes a tick,
+        so the number of snapshot reads taken so far is subtracted back out.
+        """
+        nonlocal failed_probe_reads
+        failed = next(failed_probe_counter) - failed_probe_reads
+        failed_probe_reads += 1
+        return failed
+
+    # Producer/consumer split: a dedicated thread generates and serializes
+    # batches into a bounded queue, so generation overlaps with the network IO
+    # (the GIL is released inside the gRPC publish machinery). The bound keeps
+    # memory in check if publishing falls behind.
+    batch_queue = queue.Queue(maxsize=20)
+
+    def generation_worker() -> None:
+        """
+        Generate and serialize event batches, feeding the bounded queue.
+
+        Runs on a daemon thread for the lifetime of the publisher. Blocks on
+        `queue.put` when the publisher side falls behind, which is the
+        backpressure mechanism.
+        """
+        while True:
+            events = generate_events_batch(
+                EVENTS_PER_BATCH,
+                event_type_dist, device_type_dist,
+            )
+            # Serialize on the producer side; orjson's C encoder is several
+            # times faster than stdlib json and already returns bytes.
+            batch_queue.put([orjson.dumps(event_data) for event_data in events])
+
+    threading.Thread(target=generation_worker, daemon=True).start()
+
+    last_status_time = time.monotonic()
+
+    # Effective pacing rate: the configured rate, or the budget-throttle cap
+    # (no more than 445 req/sec) when rate control is off.
+    effective_rate = base_rate if base_rate > 0 else 445.0
+    pace_target = time.perf_counter()
+
+    try:
+        while True:
+            # Drain one serialized batch from the generation thread
+            batch = batch_queue.get()
+
+            for data in batch:
+                # The publish() method is non-blocking. It returns a future.
+                # The client library handles batching in a background thread.
+                i = next(client_indices)
+                future = publishers[i].publish(topic_paths[i], data)
+                if next(probe_cycle) == 0:
+                    probe_buf.append(future)
+            published_count += len(batch)
+
+            # Control the publishing rate: token-bucket style. Each batch earns
+            # a time budget of len(batch)/rate; we sleep only the remaining
+            # deficit against a perf_counter target, so the publish/serialize
+            # time is credited and ~1ms sleep jitter does not compound. One
+            # sleep per batch instead of one per event.
+            jitter = (1 + random.uniform(-randomness, randomness)) if base_rate > 0 else 1.0
+            pace_target += (len(batch) / effective_rate) * jitter
+            now = time.perf_counter()
+            if pace_target > now:
+                time.sleep(pace_target - now)
+            elif now - pace_target > 1.0:
+                # Publishing fell behind by over a second; forgive the debt
+                # rather than bursting to catch up.
+                pace_target = now
+
+            # Optional: print a status message periodically (time-based, so the
+            # hot loop never computes a modulo per message)
+            if time.monotonic() - last_status_time >= STATUS_INTERVAL_SECONDS:
+                print(f"Published {published_count} messages so far ({snapshot_failed_probes()} failed probes)...", flush=True)
+                last_status_time = time.monotonic()
+
+    except KeyboardInterrupt:
+        print(f"\nPublisher stopped by user. Total published: {published_count}, failed probes: {snapshot_failed_probes()}")
+    except Exception as e:
+        print(f"An unexpected error occurred: {e}")
+        print(f"Total published: {published_count}, failed probes: {snapshot_failed_probes()}")
+
+
+def main() -> None:
+    """
+    Main entry point for the Pub/Sub Data Publisher.
+
+    Parses command line arguments, loads the configuration file, validates
+    required settings, and starts the message publishing process.
+
+    Command Line Arguments:
+        --config: Path to the publisher JSON configuration file (required).
+
+    Configuration File Requirements:
+        - gcp_project_id: Google Cloud project ID
+        - pubsub_topic_name: Name of the Pub/Sub topic
+        - event_type: Event type distribution configuration
+        - device_type: Device type distribution configuration
+        - country_infos: Country code distribution configuration
+        - generation_rate: Rate control settings (optional)
+        - description: Human-readable description of the data profile
+
+    Example Configuration:
+        {
+            "gcp_project_id": "my-project",
+            "pubsub_topic_name": "app-store-events",
+            "event_type": {
+                "distribution": {
+                    "app_open": 0.4,
+                    "search": 0.3,
+                    "app_install": 0.15,
+                    "review_submit": 0.05,
+                    "in_app_purchase": 0.05,
+                    "app_close": 0.04,
+                    "app_uninstall": 0.01
+                }
+            },
+            "device_type": {
+                "distribution": {"phone": 0.8, "tablet": 0.15, "desktop": 0.05}
+            },
+            "country_infos": {
+                "distribution": {"US": 0.3, "CA": 0.3, "IR": 0.4}
+            },
+            "generation_rate": {
+                "events_per_second": 0,
+                "randomness_factor": 0.2
+            },
+            "description": "Standard app store traffic profile"
+        }
+
+    Raises:
+        FileNotFoundError: If the configuration file doesn't exist.
+        json.JSONDecodeError: If the configuration file contains invalid JSON.
+        SystemExit: If required configuration values are missing.
+    """
+    global GLOBAL_TIMESTAMP_MICROS, GLOBAL_TIMESTAMP_HOUR, GLOBAL_RATE_MAXIMUM
+
+    parser = argparse.ArgumentParser(
+        description="Pub/Sub Data Publisher for App Store Simulation",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python 06_publisher_optimized.py --config publisher_config.json
+  python 06_publisher_optimized.py --config /path/to/config.json
+        """
+    )
+    parser.add_argument(
+        "--config",
+        required=True,
+        help="Path to the publisher JSON configuration file.",
+    )
+    args = parser.parse_args()
+
+    # Load publisher configuration
+    try:
+        with open(args.config, 'r') as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        print(f"Error: Configuration file not found at {args.config}")
+        return
+    except json.JSONDecodeError:
+        print(f"Error: Could not decode JSON from {args.config}")
+        return
+
+    project_id = config.get("gcp_project_id")
+    topic_name = config.get("pubsub_topic_name")
+
+    if not project_id or not topic_name:
+        print("Error: 'gcp_project_id' and 'pubsub_topic_name' must be set in the config file.")
+        return
+
+    # Initialize users by country
+    # --- Step 1: Get the country distribution ---
+    country_infos = config.get("country_infos", {})
+    country_distribution = country_infos.get("distribution", {})
+    # --- Step 2: Get the simulation parameters ---
+    simulation_parameters = config.get("simulation_parameters", {})
+    users_population_fraction = simulation_parameters.get("users_population_fraction", 0.001)
+    gke_replicas_factor = simulation_parameters.get("gke_replicas_factor", 10)
+    user_interactions_per_day = simulation_parameters.get("user_interactions_per_day", 57.0)
+    user_interactions_per_second = user_interactions_per_day/(24*60*60)
+    # --- Step 3: Initialize users by country ---
+    print("--------------------------------")
+    print("Initializing users by country...")
+    keys = list(country_distribution)
+    for country in keys:
+        weight = country_distribution[country]
+        n_users_in_country = int(weight * users_population_fraction / gke_replicas_factor)
+        if n_users_in_country == 0:
+            del country_distribution[country]
+            continue
+        USERS_BY_COUNTRY[country] = [fake.uuid4() for _ in range(n_users_in_country)]
+        GLOBAL_RATE_MAXIMUM += n_users_in_country * user_interactions_per_second
+        # Report
+        print(f"Initialized {country}: {n_users_in_country} users")
+    print("--------------------------------")
+    print(f"GLOBAL_RATE_MAXIMUM: {GLOBAL_RATE_MAXIMUM}", flush=True)
+    # Pre-generate the search-query pool: Faker's provider machinery is far too
+    # slow for the hot path, and simulated queries need not be unique.
+    SEARCH_QUERY_POOL.extend(fake.bs() for _ in range(SEARCH_QUERY_POOL_SIZE))
+    # Initialize global timestamp
+    GLOBAL_TIMESTAMP_MICROS = get_current_timestamp_micros()
+    GLOBAL_TIMESTAMP_HOUR = get_current_hour()
+    # HARD-CODED CONTINUE FROM LAST BIGQUERY RECORD
+    GLOBAL_TIMESTAMP_MICROS = 1760854441420750  # Last record: "2025-10-19 06:14:01.420750 UTC"
+    GLOBAL_TIMESTAMP_HOUR = 6.233727986111111  # Based on time above
+
+    # Precompute the sampling arrays at config-load time: the distributions
+    # never change after this point, so no per-event/per-batch dict unpacking.
+    initialize_country_arrays(country_infos)
+    event_type_dist = prepare_distribution(config.get("event_type", {}).get("distribution", {}))
+    device_type_dist = prepare_distribution(config.get("device_type", {}).get("distribution", {}))
+
+    # Start publishing messages
+    publish_messages_batch(project_id, topic_name, config, event_type_dist, device_type_dist)
+
+if __name__ == "__main__":
+    main()